@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+# numba is an optional dependency. The kernels are always decorated with the
+# njit from here, which degrades to a no-op if numba is not installed. This
+# keeps the library importable and the kernels callable (as plain python) and
+# lets the indicators check NUMBA to decide which code path is the fast one
+#
+# numba is only imported when a kernel is called for the 1st time. Importing
+# it takes longer than importing the rest of the library and processes which
+# use no kernel do not pay for it. The kernels must therefore not call other
+# kernels (numba would not know what to do with the lazy wrapper)
+#
+# The kernels are module level objects and are shared by all indicator
+# instances: a signature is compiled once per process and, with cache=True,
+# loaded from __pycache__ in later processes. The inputs are float64 (see
+# _AS_F64) or float32 if configured with config.set_dtype. Kernels supporting
+# both declare the signatures with float_sigs, allocate the outputs with the
+# dtype of the input and the indicators pass dtype() to _apply. Do not build
+# kernels in factories (closures), because the cache index does not take the
+# closed over values into account and the variants may overwrite each other
+import functools
+import importlib.util
+
+from . import config
+
+__all__ = []
+
+
+NUMBA = importlib.util.find_spec('numba') is not None
+
+
+class _LazyKernel:
+    def __init__(self, func, args, kwargs):
+        functools.update_wrapper(self, func)
+        self._func = func
+        self._args = args  # signatures, as strings to not import numba
+        self._kwargs = kwargs
+        self._kernel = None
+
+    def __call__(self, *args, **kwargs):
+        if self._kernel is None:  # 1st call, import numba and jit
+            try:
+                import numba
+            except ImportError:  # broken install, run as plain python
+                self._kernel = self._func
+            else:
+                njit = numba.njit(*self._args, **self._kwargs)
+                self._kernel = njit(self._func)
+
+        return self._kernel(*args, **kwargs)
+
+
+def njit(*args, **kwargs):
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        func = args[0]  # used as @njit
+        return _LazyKernel(func, (), {}) if NUMBA else func
+
+    if not NUMBA:
+        return lambda func: func  # used as @njit(...), return a no-op
+
+    return lambda func: _LazyKernel(func, args, kwargs)
+
+
+def float_sigs(args):
+    # signatures for a kernel taking float32 or float64 arrays. "args" are
+    # the types of the arguments with "{0}" in place of the array dtype,
+    # like in: '{0}[::1], int64'
+    return ['(' + args.format(dt) + ')' for dt in ('float32', 'float64')]
+
+
+def dtype():
+    # dtype of the arrays to pass to the kernels declaring float_sigs
+    return config.get_dtype()
+
+
+def jitable(line):
+    # the kernels take the float64 arrays delivered by _apply(..., raw=True).
+    # Numeric (and boolean) inputs convert to that, leave the rest to pandas.
+    # The user may have also disabled the kernels: config.set_use_numba(False)
+    if not NUMBA or not config.get_use_numba():
+        return False
+
+    return line._series.dtype.kind in 'biuf'
@@ -4,6 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
+import numpy as np
 
 __all__ = []
 
@@ -65,3 +66,29 @@ def set_talib_compat(onoff=True):
 
 def get_talib_compat():
     return TALIB_COMPAT
+
+
+USE_NUMBA = True  # use the numba kernels if numba is available
+
+
+def set_use_numba(onoff=True):
+    global USE_NUMBA
+    USE_NUMBA = onoff
+
+
+def get_use_numba():
+    return USE_NUMBA
+
+
+DTYPE = np.float64  # dtype of the inputs/outputs of the numba kernels
+
+
+def set_dtype(dtype=np.float64):
+    # np.float32 halves the memory (and the traffic) of the kernels. The
+    # running sums are still kept in float64 inside the kernels
+    global DTYPE
+    DTYPE = np.dtype(dtype).type
+
+
+def get_dtype():
+    return DTYPE
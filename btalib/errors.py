@@ -48,3 +48,13 @@ def ColdIndexStrNotFound(name, rename):
         'OHLC Column Name "{}" remapped to "{}", but this cannot be found'
     )
     raise InputsError(errmsg.format(name, rename))
+
+
+def StreamingValues(expected, given):
+    errmsg = 'update takes one value per input: {} expected, {} given'
+    raise InputsError(errmsg.format(expected, given))
+
+
+def StreamingNotSupported(name):
+    errmsg = '{} does not implement _stream_state, update is not available'
+    raise TaPyError(errmsg.format(name))
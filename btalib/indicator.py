@@ -7,12 +7,14 @@
 import collections
 
 from . import config
+from . import errors
 from . import meta
 from .meta import metadata
 
 __all__ = [
     'get_indicators', 'get_ind_names', 'get_ind_by_name',
     'get_ind_by_group', 'get_ind_names_by_group', 'get_groups',
+    'StreamingIndicator',
 ]
 
 
@@ -206,3 +208,39 @@ class Indicator(meta.linesholder.LinesHolder, metaclass=MetaIndicator):
     @classmethod
     def _talib_class(cls, kwdict):
         pass
+
+
+class StreamingIndicator:
+    '''
+    Mixin for indicators which can deliver the output for a new incoming sample
+    with `update`, doing O(1) work, instead of recalculating over the entire
+    series. Meant for live data feeds or for streaming long backtests.
+
+    The state is built from the last values of the inputs the 1st time that
+    `update` is called. The samples passed to `update` are not added to the
+    inputs/outputs of the indicator.
+
+    It has to be placed after `Indicator` in the bases. Indicators using it
+    must implement `_stream_state`, which returns an object with a `push`
+    method.
+    `push` takes one value per input and returns the new output value.
+    '''
+    _stream = None
+
+    def update(self, *values):
+        if len(values) != len(self.inputs):
+            errors.StreamingValues(len(self.inputs), len(values))
+
+        if self._stream is None:
+            self._stream = self._stream_state()
+            if self._stream is None:  # the indicator did not provide one
+                errors.StreamingNotSupported(self.__class__.__name__)
+
+        return self._stream.push(*values)
+
+    def _stream_state(self):
+        # Called once, on the 1st update. Return the state (an object with a
+        # push method, see indicators/_streaming.py) primed with the last
+        # values of the inputs (and outputs if needed), so that the 1st push
+        # delivers the value which would follow the last one of the output
+        return None
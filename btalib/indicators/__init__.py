@@ -7,7 +7,7 @@
 from numpy import nan as NaN  # noqa: F401
 
 # Internal objects to work in INdicator development
-from .. import Indicator  # noqa: F401
+from .. import Indicator, StreamingIndicator  # noqa: F401
 from ..utils import *  # noqa: F401 F403
 
 # Price Transform
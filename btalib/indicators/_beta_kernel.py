@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import numpy as np
+
+from .._njit import njit, float_sigs
+
+
+# Single pass beta. The returns are calculated on the fly and the 4 sums needed
+# for the regression slope are kept as running sums over a window of "period"
+# values, kept in ring buffers to be able to remove the departing value.
+#
+# As pct_change does, nan prices are forward filled before the returns are
+# calculated. The last "prets" filled prices are also kept in ring buffers
+#
+# Non-finite values (nan, inf) are not added to the sums but counted, and the
+# output is nan whilst any of them is in the window, as with pandas rolling.
+#
+# fastmath is not used because it would let the compiler assume there are no
+# nan/inf values and remove the checks.
+#
+# If prets is 0, the inputs are used directly and no returns are calculated
+#
+# For float32 inputs, the returns and sums are still float64
+
+@njit(float_sigs('{0}[::1], {0}[::1], int64, int64'),
+      cache=True, nogil=True, error_model='numpy')
+def beta_kernel(asset, market, period, prets):
+    n = len(asset)
+    out = np.full(n, np.nan, asset.dtype)
+
+    xbuf = np.zeros(period)  # ring buffers for the values in the window
+    ybuf = np.zeros(period)
+
+    abuf = np.full(max(prets, 1), np.nan)  # ring buffers for filled prices
+    mbuf = np.full(max(prets, 1), np.nan)
+    a, m = np.nan, np.nan  # last non-nan prices for forward filling
+
+    s_x, s_y, s_xx, s_xy = 0.0, 0.0, 0.0, 0.0
+    nbad = 0  # number of non-finite x, y pairs in the window
+
+    for i in range(n):
+        if not prets:
+            x, y = asset[i], market[i]
+        else:
+            if not np.isnan(asset[i]):
+                a = asset[i]
+            if not np.isnan(market[i]):
+                m = market[i]
+
+            k = i % prets
+            x = a / abuf[k] - 1.0
+            y = m / mbuf[k] - 1.0
+            abuf[k], mbuf[k] = a, m
+            if i < prets:  # no return can be calculated yet
+                continue
+
+        j = (i - prets) % period  # ring buffer position
+        if i - prets >= period:  # window full, remove the departing value
+            xo, yo = xbuf[j], ybuf[j]
+            if np.isfinite(xo) and np.isfinite(yo):
+                s_x -= xo
+                s_y -= yo
+                s_xx -= xo * xo
+                s_xy -= xo * yo
+            else:
+                nbad -= 1
+
+        xbuf[j], ybuf[j] = x, y
+        if np.isfinite(x) and np.isfinite(y):
+            s_x += x
+            s_y += y
+            s_xx += x * x
+            s_xy += x * y
+        else:
+            nbad += 1
+
+        if i - prets >= period - 1 and not nbad:
+            num = period * s_xy - s_x * s_y
+            out[i] = num / (period * s_xx - s_x * s_x)
+
+    return out
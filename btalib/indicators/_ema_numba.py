@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import numpy as np
+
+from .._njit import njit, float_sigs
+
+
+# Seeded exponential moving average in a single pass, equivalent to
+# _ewm(span=period, _seed=SEED_AVG/SEED_LAST, _poffset=poffset).mean()
+#
+# The seed is calculated over the "period" values ending at "poffset" and is
+# the 1st delivered value (at index poffset - 1). It is either the mean of the
+# values or the last of them if use_last is True
+#
+# nan values leave the average untouched, but the weight of the average keeps
+# on decaying. When the next value comes in, the weighted combination is used,
+# as pandas ewm(adjust=False) does. As in pandas, inf is taken as nan
+#
+# The average is calculated in float64 also for float32 inputs
+
+@njit(float_sigs('{0}[::1], int64, int64, boolean'), cache=True, nogil=True)
+def ema_seeded(a, period, poffset, use_last):
+    n = len(a)
+    out = np.full(n, np.nan, a.dtype)
+    if n < poffset:
+        return out
+
+    alpha = 2.0 / (period + 1.0)
+    beta = 1.0 - alpha
+
+    p2 = poffset  # seed end calc
+    p1 = p2 - period  # beginning of seed calculation
+    if use_last:
+        prev = np.float64(a[p2 - 1])
+    else:
+        prev = np.float64(np.nanmean(a[p1:p2]))
+
+    if not np.isfinite(prev):
+        prev = np.nan  # no seed, the average starts with the next value
+
+    out[p2 - 1] = prev
+
+    w = 1.0  # weight of prev
+    for i in range(p2, n):
+        w *= beta
+        x = a[i]
+        if np.isfinite(x):
+            if np.isnan(prev):
+                prev = x  # no average yet, start with the value
+            elif w == beta:  # no nan gap, regular recurrence
+                prev += alpha * (x - prev)
+            else:  # weight decayed during a nan gap
+                prev = (w * prev + alpha * x) / (w + alpha)
+
+            w = 1.0
+
+        out[i] = prev
+
+    return out
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+from .._njit import njit
+
+
+# Element-wise operations. With parallel=True numba splits the array
+# expressions amongst threads. They are memory bound and scale until the
+# memory bandwidth is saturated.
+#
+# fastmath is not used: it would let the compiler assume there are no nan/inf
+# values, which are common in the leading part of indicator results. Division
+# by zero delivers inf/nan (numpy error model) instead of raising
+
+@njit(parallel=True, cache=True, nogil=True)
+def add_k(a, b):
+    return a + b
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def sub_k(a, b):
+    return a - b
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def mult_k(a, b):
+    return a * b
+
+
+@njit(parallel=True, cache=True, nogil=True, error_model='numpy')
+def div_k(a, b):
+    return a / b
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import numpy as np
+
+from .._njit import njit, float_sigs
+
+
+# Rolling max/min with a monotonic deque: amortized O(1) per value regardless
+# of the period. The deque holds indices into "a" and lives in a ring buffer
+# of "period" elements, which is the maximum number of indices which can be in
+# the window. head and tail grow monotonically and are wrapped on access.
+#
+# nan/inf values are not pushed to the deque but are counted, to deliver nan
+# whilst any of them is in the window, as pandas rolling does (it takes inf as
+# nan)
+
+@njit(float_sigs('{0}[::1], int64, boolean'), cache=True, nogil=True)
+def _rolling_extreme(a, period, ismax):
+    n = len(a)
+    out = np.full(n, np.nan, a.dtype)
+
+    dq = np.empty(period, dtype=np.int64)
+    head, tail = 0, 0
+    nbad = 0
+
+    for i in range(n):
+        if i >= period and not np.isfinite(a[i - period]):
+            nbad -= 1  # a nan/inf leaves the window
+
+        if head < tail and dq[head % period] <= i - period:
+            head += 1  # the extreme leaves the window
+
+        if not np.isfinite(a[i]):
+            nbad += 1
+        else:
+            # remove the values which can no longer be the extreme
+            while head < tail:
+                last = a[dq[(tail - 1) % period]]
+                if (last > a[i]) if ismax else (last < a[i]):
+                    break
+                tail -= 1
+
+            dq[tail % period] = i
+            tail += 1
+
+        if i >= period - 1 and not nbad:
+            out[i] = a[dq[head % period]]
+
+    return out
+
+
+def rolling_max(a, period):  # plain python, kernels cannot call kernels
+    return _rolling_extreme(a, period, True)
+
+
+def rolling_min(a, period):
+    return _rolling_extreme(a, period, False)
+
+
+# Both deques in the same loop: a single pass over "a" delivers min and max
+
+@njit(float_sigs('{0}[::1], int64'), cache=True, nogil=True)
+def rolling_minmax(a, period):
+    n = len(a)
+    mn, mx = np.full(n, np.nan, a.dtype), np.full(n, np.nan, a.dtype)
+
+    dqmn = np.empty(period, dtype=np.int64)
+    dqmx = np.empty(period, dtype=np.int64)
+    hmn, tmn, hmx, tmx = 0, 0, 0, 0
+    nbad = 0
+
+    for i in range(n):
+        if i >= period and not np.isfinite(a[i - period]):
+            nbad -= 1  # a nan/inf leaves the window
+
+        if hmn < tmn and dqmn[hmn % period] <= i - period:
+            hmn += 1  # the min leaves the window
+
+        if hmx < tmx and dqmx[hmx % period] <= i - period:
+            hmx += 1  # the max leaves the window
+
+        if not np.isfinite(a[i]):
+            nbad += 1
+        else:
+            while hmn < tmn and a[dqmn[(tmn - 1) % period]] >= a[i]:
+                tmn -= 1
+
+            while hmx < tmx and a[dqmx[(tmx - 1) % period]] <= a[i]:
+                tmx -= 1
+
+            dqmn[tmn % period] = i
+            dqmx[tmx % period] = i
+            tmn += 1
+            tmx += 1
+
+        if i >= period - 1 and not nbad:
+            mn[i] = a[dqmn[hmn % period]]
+            mx[i] = a[dqmx[hmx % period]]
+
+    return mn, mx
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import numpy as np
+
+from .._njit import njit, float_sigs
+
+
+# Rolling sum with a running total: O(1) per value regardless of the period.
+# The departing value is subtracted before the new one is added, which is the
+# order in which ta-lib updates its running total, to deliver the same values
+#
+# nan/inf values are not added but counted, to deliver nan whilst any of them
+# is in the window, as pandas rolling does (it takes inf as nan)
+#
+# A difference of cumulative sums would also be O(n) (and pure numpy) but the
+# totals grow with the length of the input and the differences lose precision
+#
+# For float32 inputs the running total is still kept in float64 and only the
+# output is float32
+
+@njit(float_sigs('{0}[::1], int64'), cache=True, nogil=True)
+def rolling_sum(a, period):
+    n = len(a)
+    out = np.full(n, np.nan, a.dtype)
+
+    total = 0.0
+    nbad = 0
+
+    for i in range(n):
+        if i >= period:  # window full, remove the departing value
+            if not np.isfinite(a[i - period]):
+                nbad -= 1
+            else:
+                total -= a[i - period]
+
+        if not np.isfinite(a[i]):
+            nbad += 1
+        else:
+            total += a[i]
+
+        if i >= period - 1 and not nbad:
+            out[i] = total
+
+    return out
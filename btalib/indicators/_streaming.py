@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import collections
+import math
+
+import numpy as np
+
+from .. import SEED_AVG, SEED_LAST, SEED_SUM, SEED_NONE
+
+# States for StreamingIndicator.update. Each push takes the values of a new
+# sample and returns the new output value, with O(1) work. The states mirror
+# the batch kernels (nan handling included) and are primed by pushing the
+# last values of the inputs of the indicator (see _stream_tail)
+
+
+def _stream_tail(line, n):
+    # last n values of the line (from its minperiod on) as python floats
+    return _stream_values(line)[-n:].tolist()
+
+
+def _stream_values(line, minperiod=None):
+    minperiod = minperiod or line._minperiod
+    return np.asarray(line._series[minperiod - 1:], dtype=np.float64)
+
+
+def _last_valid(a):
+    # last non-nan value of the array "a" or nan if there is none
+    valid = a[~np.isnan(a)]
+    return float(valid[-1]) if len(valid) else math.nan
+
+
+class StreamSum:
+    # Running total, the departing value is subtracted before the new one is
+    # added. nan/inf values are counted, nan whilst any of them is there
+    def __init__(self, period):
+        self.period = period
+        self.window = collections.deque()
+        self.total = 0.0
+        self.nbad = 0
+
+    def push(self, x):
+        if len(self.window) == self.period:  # window full, remove departing
+            xo = self.window.popleft()
+            if math.isfinite(xo):
+                self.total -= xo
+            else:
+                self.nbad -= 1
+
+        self.window.append(x)
+        if math.isfinite(x):
+            self.total += x
+        else:
+            self.nbad += 1
+
+        if len(self.window) < self.period or self.nbad:
+            return math.nan
+
+        return self.total
+
+
+class StreamExtreme:
+    # Monotonic deque of (index, value) candidates for the max (or min) in the
+    # window. nan/inf values are not candidates, but are kept in "bad" to
+    # deliver nan whilst any of them is in the window
+    def __init__(self, period, ismax):
+        self.period = period
+        self.ismax = ismax
+        self.dq = collections.deque()
+        self.bad = collections.deque()
+        self.i = -1  # index of the last pushed value
+
+    def push(self, x):
+        self.i = i = self.i + 1
+        iout = i - self.period  # index which leaves the window
+        if self.dq and self.dq[0][0] <= iout:
+            self.dq.popleft()
+
+        if self.bad and self.bad[0] <= iout:
+            self.bad.popleft()
+
+        if not math.isfinite(x):
+            self.bad.append(i)
+        else:
+            dq, ismax = self.dq, self.ismax
+            while dq and ((dq[-1][1] <= x) if ismax else (dq[-1][1] >= x)):
+                dq.pop()
+
+            dq.append((i, x))
+
+        if i < self.period - 1 or self.bad:
+            return math.nan
+
+        return self.dq[0][1]
+
+
+class StreamEma:
+    # prev + alpha * (new - prev). nan/inf values leave the average untouched
+    # but the weight keeps on decaying, as in the batch calculation. Until the
+    # seed can be calculated (poffset values) the values are kept in pending
+    def __init__(self, period, poffset, seed, prev=math.nan, w=1.0,
+                 pending=None):
+        self.period = period
+        self.poffset = poffset
+        self.seed = seed
+        self.alpha = alpha = 2.0 / (period + 1.0)
+        self.beta = 1.0 - alpha
+        self.prev = float(prev)  # python floats, no numpy scalar warnings
+        self.w = w  # weight of prev
+        self.pending = pending
+
+    def _seed(self):
+        vals = np.asarray(self.pending[self.poffset - self.period:])
+        self.pending = None
+        self.w = 1.0
+        if self.seed == SEED_AVG:
+            valid = vals[~np.isnan(vals)]
+            self.prev = float(valid.mean()) if len(valid) else math.nan
+        elif self.seed == SEED_LAST:
+            self.prev = float(vals[-1])
+        elif self.seed == SEED_SUM:
+            self.prev = float(np.nansum(vals))
+        elif self.seed == SEED_NONE:
+            self.prev = math.nan
+        else:  # SEED_ZERO, SEED_ZFILL
+            self.prev = 0.0
+
+        if not math.isfinite(self.prev):
+            self.prev = math.nan  # no seed, start with the next value
+
+        return self.prev
+
+    def push(self, x):
+        if self.pending is not None:
+            self.pending.append(x)
+            if len(self.pending) < self.poffset:
+                return math.nan
+
+            return self._seed()
+
+        x = float(x)  # python floats, no numpy scalar warnings
+        self.w *= self.beta
+        if math.isfinite(x):
+            if math.isnan(self.prev):
+                self.prev = x  # no average yet, start with the value
+            elif self.w == self.beta:  # no nan gap, regular recurrence
+                self.prev += self.alpha * (x - self.prev)
+            else:  # weight decayed during a nan gap
+                w, alpha = self.w, self.alpha
+                self.prev = (w * self.prev + alpha * x) / (w + alpha)
+
+            self.w = 1.0
+
+        return self.prev
+
+
+class StreamBeta:
+    # Returns calculated from the last "prets" forward filled prices and the
+    # 4 running sums for the slope over the last "period" returns. If prets is
+    # 0 the values are used directly. nan/inf returns are counted, as in the
+    # kernel, to deliver nan whilst any of them is in the window
+    def __init__(self, period, prets, asset=math.nan, market=math.nan):
+        self.period = period
+        self.prets = prets
+        self.prices = collections.deque()  # last "prets" filled prices
+        self.a, self.m = asset, market  # last non-nan prices for filling
+        self.window = collections.deque()
+        self.s_x = self.s_y = self.s_xx = self.s_xy = 0.0
+        self.nbad = 0
+
+    def _sums(self, x, y, sign):
+        if math.isfinite(x) and math.isfinite(y):
+            self.s_x += sign * x
+            self.s_y += sign * y
+            self.s_xx += sign * x * x
+            self.s_xy += sign * x * y
+        else:
+            self.nbad += sign
+
+    def push(self, asset, market):
+        if not self.prets:
+            x, y = float(asset), float(market)
+        else:
+            if not math.isnan(asset):
+                self.a = asset
+            if not math.isnan(market):
+                self.m = market
+
+            self.prices.append((self.a, self.m))
+            if len(self.prices) <= self.prets:  # no return can be calculated
+                return math.nan
+
+            a0, m0 = self.prices.popleft()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x = float(np.float64(self.a) / a0 - 1.0)
+                y = float(np.float64(self.m) / m0 - 1.0)
+
+        if len(self.window) == self.period:  # remove the departing value
+            self._sums(*self.window.popleft(), -1)
+
+        self.window.append((x, y))
+        self._sums(x, y, 1)
+
+        if len(self.window) < self.period or self.nbad:
+            return math.nan
+
+        p = self.period
+        with np.errstate(divide='ignore', invalid='ignore'):
+            num = np.float64(p * self.s_xy - self.s_x * self.s_y)
+            return float(num / (p * self.s_xx - self.s_x * self.s_x))
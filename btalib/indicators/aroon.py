@@ -5,16 +5,20 @@
 # Use of this source code is governed by the MIT License
 ###############################################################################
 from . import Indicator
+from .mathop import _rolling_argx
 
 import numpy as np
 
 
-def _first_idx_highest(x):
-    return np.argmax(x[::-1])
+# Called with all rolling windows at once (see _rolling_argx). The windows are
+# reversed to deliver the distance from the end to the most recent extreme
 
+def _first_idx_highest(windows, axis):
+    return np.argmax(windows[:, ::-1], axis=axis)
 
-def _first_idx_lowest(x):
-    return np.argmin(x[::-1])
+
+def _first_idx_lowest(windows, axis):
+    return np.argmin(windows[:, ::-1], axis=axis)
 
 
 class _aroon(Indicator):
@@ -32,10 +36,14 @@ class _aroon(Indicator):
     def __init__(self):
         p = self.p.period
 
-        hhidx = self.i.high.rolling(window=p + 1).apply(_first_idx_highest)
+        hi, hifunc = self.i.high, _first_idx_highest
+        hhidx = hi._apply(_rolling_argx, p + 1, hifunc, False, raw=True)
+        hhidx._period(p + 1, rolling=True)
         self._aup = 100.0 - 100.0 * hhidx / p
 
-        llidx = self.i.low.rolling(window=p + 1).apply(_first_idx_lowest)
+        lo, lofunc = self.i.low, _first_idx_lowest
+        llidx = lo._apply(_rolling_argx, p + 1, lofunc, False, raw=True)
+        llidx._period(p + 1, rolling=True)
         self._adn = 100.0 - 100.0 * llidx / p
 
 
@@ -4,10 +4,45 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator
+from . import Indicator, StreamingIndicator
+from .. import _njit
+from ._beta_kernel import beta_kernel
+from ._streaming import StreamBeta, _last_valid, _stream_values
 
+import numpy as np
 
-class beta(Indicator):
+
+def _rolling_sum(a, p):
+    # O(n) rolling sum as the difference of cumulative sums p positions apart.
+    # Non-finite values are summed as 0.0 but counted, to deliver nan whilst
+    # any of them is in the window, like pandas rolling does
+    out = np.full(len(a), np.nan)
+
+    bad = ~np.isfinite(a)
+    cs = np.concatenate(([0.0], np.cumsum(np.where(bad, 0.0, a))))
+    cb = np.concatenate(([0], np.cumsum(bad)))
+
+    out[p - 1:] = cs[p:] - cs[:-p]
+    out[p - 1:][(cb[p:] - cb[:-p]) > 0] = np.nan
+    return out
+
+
+def _beta(x, y, p):
+    s_x, s_y = _rolling_sum(x, p), _rolling_sum(y, p)
+
+    buf = np.empty_like(x)  # 1 buffer for both products, consumed in turn
+    s_xx = _rolling_sum(np.multiply(x, x, out=buf), p)
+    s_xy = _rolling_sum(np.multiply(x, y, out=buf), p)
+
+    # num/den calculated in place in the sums, no longer needed afterwards
+    with np.errstate(divide='ignore', invalid='ignore'):  # as pandas does
+        num = np.subtract(np.multiply(s_xy, p, out=s_xy), s_x * s_y, out=s_xy)
+        s_x *= s_x
+        den = np.subtract(np.multiply(s_xx, p, out=s_xx), s_x, out=s_xx)
+        return np.divide(num, den, out=num)
+
+
+class beta(Indicator, StreamingIndicator):
     '''
     The description of the algorithm has been adapted from `ta-lib`
 
@@ -38,16 +73,35 @@ class beta(Indicator):
     def __init__(self):
         p, prets = self.p.period, self.p._prets
 
+        a, m = self.i.asset, self.i.market
+        if _njit.jitable(a) and _njit.jitable(m):  # returns + sums fused
+            prets *= self.p._rets  # prets=0 => kernel uses the raw inputs
+            beta = a._apply(beta_kernel, m, p, prets, raw=True,
+                            dtype=_njit.dtype())
+            self.o.beta = beta._period(prets + p - 1)  # returns + window
+            return
+
         if self.p._rets:
             x = self.i.asset.pct_change(periods=prets)  # stock returns
             y = self.i.market.pct_change(periods=prets)  # market returns
         else:
             x, y = self.i.asset, self.i.market
 
-        s_x = x.rolling(window=p).sum()
-        s_y = y.rolling(window=p).sum()
+        beta = x._apply(_beta, y, p, raw=True)  # rolling sums via cumsum
+        self.o.beta = beta._period(p - 1)
+
+    def _stream_state(self):
+        p, prets = self.p.period, self.p._prets * self.p._rets
+
+        minperiod = max(self.i.asset._minperiod, self.i.market._minperiod)
+        a = _stream_values(self.i.asset, minperiod)
+        m = _stream_values(self.i.market, minperiod)
 
-        s_xx = x.pow(2).rolling(window=p).sum()
-        s_xy = (x * y).rolling(window=p).sum()
+        # replay the values needed for the returns in the window, starting
+        # with the last valid prices before them for the forward filling
+        i0 = max(0, len(a) - prets - p)
+        state = StreamBeta(p, prets, _last_valid(a[:i0]), _last_valid(m[:i0]))
+        for x, y in zip(a[i0:].tolist(), m[i0:].tolist()):
+            state.push(x, y)
 
-        self.o.beta = (p * s_xy - s_x * s_y) / (p * s_xx - s_x.pow(2))
+        return state
@@ -4,7 +4,12 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, SEED_AVG
+from . import Indicator, StreamingIndicator, SEED_AVG, SEED_LAST, _SERIES
+from .. import _njit
+from ._ema_numba import ema_seeded
+from ._streaming import StreamEma, _stream_values
+
+import numpy as np
 
 # named argument poffset in __init__ below is for compatibility with ta-lib
 # broken MACD. When poffset > period, the delivery of the 1st valid value
@@ -12,7 +17,7 @@ from . import Indicator, SEED_AVG
 # The start of the calculation is accordingly delayed: poffset - period
 
 
-class ema(Indicator):
+class ema(Indicator, StreamingIndicator):
     '''
     A Moving Average that smoothes data exponentially over time.
 
@@ -36,4 +41,33 @@ class ema(Indicator):
 
     def __init__(self, poffset=0):  # see above for poffset
         span, seed, poff = self.p.period, self.p._seed, poffset
-        self.o.ema = self.i0._ewm(span=span, _seed=seed, _poffset=poff).mean()
+        self._poffset = poffset or span  # kept for update
+
+        if _njit.jitable(self.i0) and seed in (SEED_AVG, SEED_LAST):
+            poff = poff or span  # seed and recurrence in a numba kernel
+            uselast = seed == SEED_LAST
+            ema = self.i0._apply(ema_seeded, span, poff, uselast, raw=True,
+                                 dtype=_njit.dtype())
+            self.o.ema = ema._period(span, rolling=True)  # poffset: no inc
+        else:
+            self.o.ema = self.i0._ewm(
+                span=span, _seed=seed, _poffset=poff).mean()
+
+    def _stream_state(self):
+        span, seed, poff = self.p.period, self.p._seed, self._poffset
+
+        a = _stream_values(self.i0)
+        if len(a) < poff:  # no seed yet, keep the values to calculate it
+            return StreamEma(span, poff, seed, pending=a.tolist())
+
+        # continue from the last value. The weight has decayed with the nan/inf
+        # values after the last valid one (or after the seed)
+        tail = a[poff:]
+        valid = np.flatnonzero(np.isfinite(tail))
+        nnans = len(tail) - (valid[-1] + 1 if len(valid) else 0)
+
+        state = StreamEma(span, poff, seed, prev=_SERIES(self.o.ema).iloc[-1])
+        for _ in range(nnans):
+            state.w *= state.beta  # same decay steps as the calculation
+
+        return state
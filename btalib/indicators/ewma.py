@@ -20,6 +20,10 @@ class ewma(Indicator):
 
     The purpose of this, is to be able to use this in place of the real `ema`
     with parameters like `period` and `_seed` for compatibility.
+
+    The `engine` and `engine_kwargs` parameters are passed to `mean` (pandas
+    >= 1.3). `engine='numba'` pays off for long series, where the compilation
+    time is amortized. If `None` (default), nothing is passed to pandas.
     '''
     group = 'overlap'
     alias = 'EWMA'
@@ -28,8 +32,15 @@ class ewma(Indicator):
         ('period', 30, 'Default Period for the ewm calculation'),
         ('adjust', False, 'Default calc individual terms like in `ema`'),
         ('_seed', SEED_AVG, '(nop) for compatibility with `ema`'),
+        ('engine', None, 'pandas engine for mean: None/"cython"/"numba"'),
+        ('engine_kwargs', None, 'pandas engine_kwargs, ex: {"nogil": True}'),
     )
 
     def __init__(self, **kwargs):
         kwargs.setdefault('span', self.p.period)  # translate period to span
-        self.o.ewma = self.i0.ewm(adjust=self.p.adjust, **kwargs).mean()
+        ewm = self.i0.ewm(adjust=self.p.adjust, **kwargs)
+
+        # pass engine args only if set, older pandas versions do not take them
+        engine = (('engine', self.p.engine),
+                  ('engine_kwargs', self.p.engine_kwargs))
+        self.o.ewma = ewm.mean(**{k: v for k, v in engine if v is not None})
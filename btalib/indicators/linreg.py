@@ -4,7 +4,8 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, atan
+from . import Indicator, atan, _FUSED
+from .mathop import _rolling_dot
 
 import numpy as np
 
@@ -69,13 +70,17 @@ class _linreg_base(Indicator):
         # Triangle formula below, else: s_xx = sum(pow(x, 2) for x in prange)
         s_xx = p1 * (p1 + 1) * (2*p1 + 1) / 6
 
-        pxdot = list(range(p0, p1 + 1))
-        s_xy = self.i0.rolling(window=p).apply(lambda x: x.dot(pxdot))
+        pxdot = np.arange(p0, p1 + 1, dtype=np.float64)  # dot all windows
+        s_xy = self.i0._apply(_rolling_dot, pxdot, raw=True)
+        s_xy = s_xy._period(p, rolling=True)
 
-        self._m = m = (p * s_xy - s_x * s_y) / (p * s_xx - s_x * s_x)
+        # single pass over the lines for each of the chained formulas
+        mexpr = '(p * s_xy - s_x * s_y) / (p * s_xx - s_x * s_x)'
+        self._m = m = _FUSED(mexpr, p=p, s_x=s_x, s_y=s_y,
+                             s_xx=s_xx, s_xy=s_xy)
 
         if self._intercept:
-            self._b = (s_y - m * s_x) / p
+            self._b = _FUSED('(s_y - m * s_x) / p', s_y=s_y, m=m, s_x=s_x, p=p)
 
 
 class linearreg_slope(_linreg_base):
@@ -188,7 +193,8 @@ class linearreg(_linreg_base):
     _intercept = True
 
     def __init__(self):
-        self.o.linreg = self._b + self._m * (self.p.period - 1)
+        self.o.linreg = _FUSED('b + m * x', b=self._b, m=self._m,
+                               x=self.p.period - 1)
 
     def _talib(self, kwdict):
         '''`pminus1` is there for compatibility with the broken ta-lib behavior
@@ -233,7 +239,7 @@ class tsf(_linreg_base):
     _intercept = True
 
     def __init__(self):
-        self.o.tsf = self._b + self._m * self.p.period
+        self.o.tsf = _FUSED('b + m * x', b=self._b, m=self._m, x=self.p.period)
 
     def _talib(self, kwdict):
         '''`pminus1` is there for compatibility with the broken ta-lib behavior
@@ -5,6 +5,7 @@
 # Use of this source code is governed by the MIT License
 ###############################################################################
 from . import Indicator, sma
+from .mathop import _rolling_count, _rolling_windows
 
 import numpy as np
 
@@ -24,8 +25,26 @@ class mad(Indicator):
         ('_ma', sma, 'Moving Average to use'),
     )
 
-    _mad = lambda self, x: np.fabs(x - x.mean()).mean()  # noqa: E731
+    _CHUNK = 1 << 16  # values per block of windows, caps the temporaries
+
+    @classmethod
+    def _mad(cls, a, p):  # mean abs dev over blocks of windows at once
+        out = np.full(len(a), np.nan)
+        if len(a) >= p:  # nan/inf in the window => nan, as pandas rolling
+            bad = ~np.isfinite(a)
+            w = _rolling_windows(np.where(bad, 0.0, a), p)
+            res = out[p - 1:]
+            step = max(1, cls._CHUNK // p)  # O(step * p) memory, not O(n * p)
+            for i in range(0, len(w), step):
+                wi = w[i:i + step]
+                dev = np.fabs(wi - wi.mean(axis=1)[:, None])
+                res[i:i + step] = dev.mean(axis=1)
+
+            res[_rolling_count(bad, p) > 0] = np.nan
+
+        return out
 
     def __init__(self, mean=None):
-        r = self.i0.rolling(window=self.p.period)  # get rolling win of period
-        self.o.meandev = r.apply(self._mad, raw=False)  # apply mean abs dev
+        p = self.p.period
+        meandev = self.i0._apply(self._mad, p, raw=True)
+        self.o.meandev = meandev._period(p, rolling=True)
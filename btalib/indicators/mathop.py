@@ -4,11 +4,112 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator
+from . import Indicator, StreamingIndicator, _SERIES, _MINIDX
+from .. import _njit
+from ._mathop_numba import add_k, div_k, mult_k, sub_k
+from ._rolling_minmax import rolling_max, rolling_min, rolling_minmax
+from ._rolling_sum import rolling_sum
+from ._streaming import StreamExtreme, StreamSum, _stream_tail
 
-import itertools
+import operator
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+try:
+    import bottleneck as bn
+except ImportError:  # optional, the pandas rolling functions will be used
+    bn = None
+
+
+def _bottleneckable(line):
+    # bottleneck works on the float64 arrays delivered by _apply(raw=True)
+    return bn is not None and _SERIES(line).dtype.kind in 'biuf'
+
+
+def _bn_move(a, p, bnfunc):
+    # pandas rolling takes inf as nan, bottleneck does not. "a" is a copy
+    if len(a) < p:  # bottleneck rejects windows larger than the input
+        return np.full(len(a), np.nan)
+
+    a[np.isinf(a)] = np.nan
+    return bnfunc(a, p, min_count=p)
+
+
+def _rawbinop(a, b):
+    # The element-wise operations on the raw arrays work by position and
+    # deliver floats. Use them only for floats (pandas keeps the dtype of
+    # others) with equal indices (pandas would align them)
+    sa, sb = _SERIES(a), _SERIES(b)
+    return sa.dtype.kind == sb.dtype.kind == 'f' and sa.index.equals(sb.index)
+
+
+def _binop(a, b, kernel, ufunc, pdop):
+    # Run the multithreaded numba kernel if possible or else the numpy ufunc,
+    # skipping the pandas alignment bookkeeping. Fall back to pandas (pdop)
+    # if the inputs need it
+    if not _rawbinop(a, b):
+        return pdop(a, b)
+
+    if _njit.jitable(a) and _njit.jitable(b):
+        return a._apply(kernel, b, raw=True)
+
+    def _npbinop(x, y):
+        with np.errstate(divide='ignore', invalid='ignore'):  # as pandas
+            return ufunc(x, y, out=x)  # x is a private copy from _apply
+
+    return a._apply(_npbinop, b, raw=True)
+
+
+def _rolling_windows(a, p):
+    # a read-only (n - p + 1, p) strided view which holds all windows of "a",
+    # to replace rolling(...).apply callbacks with a single vectorized call
+    s = a.strides[0]
+    return as_strided(a, shape=(len(a) - p + 1, p), strides=(s, s),
+                      writeable=False)
+
+
+def _rolling_count(b, p):
+    # number of True values of the boolean array "b" in each window of p
+    cb = np.concatenate(([0], np.cumsum(b)))
+    return cb[p:] - cb[:-p]
+
+
+# The vectorized functions below deliver nan for windows with nan/inf values,
+# as pandas rolling does (it takes inf as nan). The non-finite values are
+# zeroed before the calculation and the affected windows masked afterwards
+
+def _rolling_dot(a, weights):
+    # Vectorized rolling dot product of the windows with the weights, in a
+    # single matrix-vector product
+    out = np.full(len(a), np.nan)
+    p = len(weights)
+    if len(a) >= p:
+        bad = ~np.isfinite(a)
+        out[p - 1:] = _rolling_windows(np.where(bad, 0.0, a), p) @ weights
+        out[p - 1:][_rolling_count(bad, p) > 0] = np.nan
+
+    return out
+
+
+def _rolling_argx(a, p, argfunc, absidx):
+    # Vectorized rolling argmax/argmin: argfunc runs over axis 1 of the windows
+    # in a single call. With absidx (ta-lib), the warm-up and the windows with
+    # non-finite values deliver 0 instead of nan, as ta-lib does
+    fill = 0.0 if absidx else np.nan
+    out = np.full(len(a), fill)
+    if len(a) < p:
+        return out
+
+    bad = ~np.isfinite(a)
+    windows = _rolling_windows(np.where(bad, 0.0, a), p)
+    idx = argfunc(windows, axis=1).astype(np.float64)
+    if absidx:  # make the window relative index absolute
+        idx += np.arange(len(idx))
+
+    idx[_rolling_count(bad, p) > 0] = fill
+    out[p - 1:] = idx
+    return out
 
 
 # ## over the entire series
@@ -26,7 +127,8 @@ class add(Indicator):
     outputs = 'add'
 
     def __init__(self):
-        self.o.add = self.i.input1 + self.i.input2
+        i1, i2 = self.i.input1, self.i.input2
+        self.o.add = _binop(i1, i2, add_k, np.add, operator.add)
 
 
 class div(Indicator):
@@ -42,7 +144,8 @@ class div(Indicator):
     outputs = 'div'
 
     def __init__(self):
-        self.o.div = self.i.input1 / self.i.input2
+        i1, i2 = self.i.input1, self.i.input2
+        self.o.div = _binop(i1, i2, div_k, np.divide, operator.truediv)
 
 
 class mult(Indicator):
@@ -58,7 +161,8 @@ class mult(Indicator):
     outputs = 'mult'
 
     def __init__(self):
-        self.o.mult = self.i.input1 * self.i.input2
+        i1, i2 = self.i.input1, self.i.input2
+        self.o.mult = _binop(i1, i2, mult_k, np.multiply, operator.mul)
 
 
 class sub(Indicator):
@@ -74,12 +178,13 @@ class sub(Indicator):
     outputs = 'sub'
 
     def __init__(self):
-        self.o.sub = self.i.input1 - self.i.input2
+        i1, i2 = self.i.input1, self.i.input2
+        self.o.sub = _binop(i1, i2, sub_k, np.subtract, operator.sub)
 
 
 # ## over a period
 
-class max(Indicator):
+class max(Indicator, StreamingIndicator):
     '''
     Rolling maximum over `period` of the input
 
@@ -94,10 +199,26 @@ class max(Indicator):
     )
 
     def __init__(self):
-        self.o.max = self.i0.rolling(window=self.p.period).max()
+        p = self.p.period
+        if _njit.jitable(self.i0):  # monotonic deque in a numba kernel
+            mx = self.i0._apply(rolling_max, p, raw=True, dtype=_njit.dtype())
+        elif _bottleneckable(self.i0):  # monotonic deque in C
+            mx = self.i0._apply(_bn_move, p, bn.move_max, raw=True)
+        else:
+            self.o.max = self.i0.rolling(window=p).max()
+            return
+
+        self.o.max = mx._period(p, rolling=True)
+
+    def _stream_state(self):  # monotonic deque primed with the last values
+        state = StreamExtreme(self.p.period, ismax=True)
+        for x in _stream_tail(self.i0, self.p.period):
+            state.push(x)
 
+        return state
 
-class min(Indicator):
+
+class min(Indicator, StreamingIndicator):
     '''
     Rolling minimum over `period` of the input
 
@@ -112,7 +233,23 @@ class min(Indicator):
     )
 
     def __init__(self):
-        self.o.min = self.i0.rolling(window=self.p.period).min()
+        p = self.p.period
+        if _njit.jitable(self.i0):  # monotonic deque in a numba kernel
+            mn = self.i0._apply(rolling_min, p, raw=True, dtype=_njit.dtype())
+        elif _bottleneckable(self.i0):  # monotonic deque in C
+            mn = self.i0._apply(_bn_move, p, bn.move_min, raw=True)
+        else:
+            self.o.min = self.i0.rolling(window=p).min()
+            return
+
+        self.o.min = mn._period(p, rolling=True)
+
+    def _stream_state(self):  # monotonic deque primed with the last values
+        state = StreamExtreme(self.p.period, ismax=False)
+        for x in _stream_tail(self.i0, self.p.period):
+            state.push(x)
+
+        return state
 
 
 class minmax(Indicator):
@@ -131,8 +268,15 @@ class minmax(Indicator):
     )
 
     def __init__(self):
-        self.o.min = min(self.i0, period=self.p.period)
-        self.o.max = max(self.i0, period=self.p.period)
+        if _njit.jitable(self.i0):  # single pass for both, no sub-indicators
+            p = self.p.period
+            mn, mx = self.i0._applymulti(rolling_minmax, p, raw=True,
+                                         dtype=_njit.dtype())
+            self.o.min = mn._period(p, rolling=True)
+            self.o.max = mx._period(p, rolling=True)
+        else:
+            self.o.min = min(self.i0, period=self.p.period)
+            self.o.max = max(self.i0, period=self.p.period)
 
 
 class maxindex(Indicator):
@@ -150,19 +294,20 @@ class maxindex(Indicator):
         ('_absidx', False, 'Return maxindex over the entire period'),
     )
 
-    def _argmax(self, x):
-        return np.argmax(x) + (next(self._count) * self.p._absidx)
-
     def __init__(self):
-        i0rolling = self.i0.rolling(window=self.p.period)  # prep rolling win
+        p, absidx = self.p.period, self.p._absidx
+        idx = self.i0._apply(_rolling_argx, p, np.argmax, absidx, raw=True)
+        idx = idx._period(p, rolling=True)
 
-        if not self.p._absidx:  # maxindex relative to window period
-            self.o.maxindex = i0rolling.apply(np.argmax)
+        if not absidx:  # maxindex relative to window period
+            self.o.maxindex = idx
         else:
             # maxindex is absolute with respect to all previous vals in array
-            self._count = itertools.count()  # help win rel-index => absolute
-            self.o.maxindex = i0rolling.apply(self._argmax)._series.fillna(0)
-            # using the raw _series resets period to 1, fillna fills as ta-lib
+            # and the 0s of ta-lib are already there. Only the values before
+            # the minperiod of the input (nan from _apply) are left to be set
+            s = _SERIES(idx)
+            s.iloc[:_MINIDX(self.i0)] = 0.0
+            self.o.maxindex = s  # using the raw _series resets period to 1
 
     def _talib(self, kwdict):
         '''ta-lib returns 0 as index during the warm-up period and then returns the
@@ -186,19 +331,20 @@ class minindex(Indicator):
         ('_absidx', False, 'Return maxindex over the entire period'),
     )
 
-    def _argmin(self, x):
-        return np.argmin(x) + (next(self._count) * self.p._absidx)
-
     def __init__(self):
-        i0rolling = self.i0.rolling(window=self.p.period)  # prep rolling win
+        p, absidx = self.p.period, self.p._absidx
+        idx = self.i0._apply(_rolling_argx, p, np.argmin, absidx, raw=True)
+        idx = idx._period(p, rolling=True)
 
-        if not self.p._absidx:  # maxindex relative to window period
-            self.o.minindex = i0rolling.apply(np.argmin)
+        if not absidx:  # minindex relative to window period
+            self.o.minindex = idx
         else:
-            # maxindex is absolute with respect to all previous vals in array
-            self._count = itertools.count()  # help win rel-index => absolute
-            self.o.minindex = i0rolling.apply(self._argmin)._series.fillna(0)
-            # using the raw _series resets period to 1, fillna fills as ta-lib
+            # minindex is absolute with respect to all previous vals in array
+            # and the 0s of ta-lib are already there. Only the values before
+            # the minperiod of the input (nan from _apply) are left to be set
+            s = _SERIES(idx)
+            s.iloc[:_MINIDX(self.i0)] = 0.0
+            self.o.minindex = s  # using the raw _series resets period to 1
 
     def _talib(self, kwdict):
         '''ta-lib returns 0 as index during the warm-up period and then returns the
@@ -236,7 +382,7 @@ class minmaxindex(Indicator):
         kwdict.setdefault('_talib', True)  # re-set value for sub-indicators
 
 
-class sum(Indicator):
+class sum(Indicator, StreamingIndicator):
     '''
     Rolling sum over `period` of the input
 
@@ -251,4 +397,16 @@ class sum(Indicator):
     )
 
     def __init__(self):
-        self.o.sum = self.i0.rolling(window=self.p.period).sum()
+        if _njit.jitable(self.i0):  # running total in a numba kernel
+            s = self.i0._apply(rolling_sum, self.p.period, raw=True,
+                               dtype=_njit.dtype())
+            self.o.sum = s._period(self.p.period, rolling=True)
+        else:
+            self.o.sum = self.i0.rolling(window=self.p.period).sum()
+
+    def _stream_state(self):  # running total primed with the last values
+        state = StreamSum(self.p.period)
+        for x in _stream_tail(self.i0, self.p.period):
+            state.push(x)
+
+        return state
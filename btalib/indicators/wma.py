@@ -5,6 +5,7 @@
 # Use of this source code is governed by the MIT License
 ###############################################################################
 from . import Indicator
+from .mathop import _rolling_dot
 
 import numpy as np
 
@@ -33,8 +34,9 @@ class wma(Indicator):
     def __init__(self):
         # pre-calculate coe
         # weights = np.array([x for x in range(1, self.p.period + 1)])  # weights
-        weights = np.array(list(range(1, self.p.period + 1)))  # weights
-        _wma = lambda x: np.dot(x, weights)  # closure  # noqa: E731
+        p = self.p.period
+        weights = np.arange(1, p + 1, dtype=np.float64)  # weights
 
-        coef = 2.0 / (self.p.period * (self.p.period + 1))  # calc coef &
-        self.o.wma = coef * self.i0.rolling(window=self.p.period).apply(_wma)
+        coef = 2.0 / (p * (p + 1))  # calc coef & dot over all windows at once
+        wdot = self.i0._apply(_rolling_dot, weights, raw=True)
+        self.o.wma = coef * wdot._period(p, rolling=True)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import numpy as np
+
+from .._njit import njit
+
+
+# Recurrences of exponential smoothing for the _ewm of lines, the same
+# arithmetic as the python loops in _MultiFunc_Op (which are used if numba is
+# not there) to deliver the same values. Both work in place on "x", the
+# trailer delivered by pandas, with the seed value at x[0]
+
+@njit(cache=True, nogil=True)
+def ewm_recursive(x, alpha, beta):
+    # alpha => new data, beta => old data
+    prev = x[0]
+    for i in range(1, len(x)):
+        x[i] = prev = beta * prev + alpha * x[i]
+
+    return x
+
+
+@njit(cache=True, nogil=True)
+def ewm_dynalpha(x, alphas):
+    # alphas[i - 1] is the alpha for x[i]. The seed isn't part of the result
+    prev = x[0]
+    x[0] = np.nan
+    for i in range(1, len(alphas) + 1):
+        x[i] = prev = prev + alphas[i - 1] * (x[i] - prev)
+
+    return x
@@ -4,18 +4,40 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
+import functools
+import math
+
 from . import config
-from .metadata import metadata
 from . import linesholder
 from . import linesops
 from .. import SEED_AVG, SEED_LAST, SEED_SUM, SEED_NONE, SEED_ZERO, SEED_ZFILL
+from .. import _AS_F64, _WRAP
+from .. import _njit
+from ._ewm_numba import ewm_dynalpha, ewm_recursive
 
 import numpy as np
 import pandas as pd
 
+try:
+    from scipy import signal
+except ImportError:  # optional, the smoothing loops are used instead
+    signal = None
+
 __all__ = ['Line', 'Lines']
 
 
+def _alias_property(target):
+    # property for an alias of line "target". Made in a function to bind each
+    # alias to its own target (closures in a loop see only the last value)
+    def get_alias_to_name(self):
+        return getattr(self, target)
+
+    def set_alias_to_name(self, value):
+        setattr(self, target, value)
+
+    return property(get_alias_to_name, set_alias_to_name)
+
+
 def _generate(cls, bases, dct, name='', klass=None, **kwargs):
     # If "name" is defined (inputs, outputs) it overrides any previous
     # definition from the base clases.
@@ -78,34 +100,69 @@ def _generate(cls, bases, dct, name='', klass=None, **kwargs):
             clsdefs = (clsdefs,)  # unpacked below
         final_defs = lbdefs + clsdefs
 
-    # removed remapped lines from definitions
-    remapped = list(defmappings.values())
-
-    # retain last inputs defs - super readable and pythonic one-liner
-    lines = tuple(reversed(list(dict.fromkeys(reversed(final_defs)))))
-    lines = tuple(x for x in lines if x not in remapped)
+    # retain last inputs defs and remove the remapped lines from them. Going
+    # backwards: a name is skipped if remapped or already seen
+    skip = set(defmappings.values())
+    lines = [x for x in reversed(final_defs) if not (x in skip or skip.add(x))]
+    lines = tuple(reversed(lines))
     setattr(cls, name, lines)  # install all lines defs
 
     # Create base dictionary for subclassing via typ
     clsdct = dict(__module__=cls.__module__, __slots__=list(lines))
 
     # Create properties for attribute retrieval of old line
-    propdct = {}
-    for name, alias in defmappings.items():
-        def get_alias_to_name(self):
-            return getattr(self, name)
-
-        def set_alias_to_name(self, value):
-            setattr(self, name, value)
-
-        propdct[alias] = property(get_alias_to_name, set_alias_to_name)
+    propdct = {alias: _alias_property(lname)
+               for lname, alias in defmappings.items()}
 
     clsdct.update(propdct)  # add properties for alias remapping
     clsname = name.capitalize() + cls.__name__  # decide name
     return type(clsname, (klass,), clsdct)  # subclass and return
 
 
+_NP_SCALARS = (int, float, np.integer, np.floating)
+_INT64 = np.iinfo(np.int64)  # range of the python ints for the ufuncs
+
+
+def _np_binop_operand(line, other, dtype=np.float64):
+    # A numpy ufunc delivers the pandas result for a float64 series if other
+    # is a float64 series with the same index (i.e.: no alignment) or a number.
+    # Logical ufuncs do the same if dtype is bool: bool series and scalars.
+    # Returns the values of the operand or None if pandas has to do the job
+    series = line._series
+    if series.dtype != dtype:
+        return None
+
+    oseries = getattr(other, '_series', other)
+    if isinstance(oseries, pd.Series):
+        if oseries.dtype == dtype and oseries.index.equals(series.index):
+            if isinstance(other, Line):
+                return other._values
+
+            return oseries.to_numpy()
+
+        return None
+
+    if dtype == np.bool_:
+        return other if isinstance(other, (bool, np.bool_)) else None
+
+    if isinstance(other, _NP_SCALARS) and not isinstance(other, bool):
+        if isinstance(other, int) and not _INT64.min <= other <= _INT64.max:
+            return None  # the ufunc cannot convert it, pandas uses objects
+
+        return other
+
+    return None
+
+
 def binary_op(name):
+    npop, npdtype = linesops._BINOPS_NP.get(name), np.float64
+    if npop is None:
+        npop, npdtype = linesops._BINOPS_NP_BOOL.get(name), np.bool_
+
+    if npop is not None:
+        ufunc, reflected = getattr(np, npop[0]), npop[1]
+        dtype = ufunc(npdtype(1), npdtype(1)).dtype  # bool for cmp/logical
+
     def real_binary_op(self, other, *args, **kwargs):
         # Executes a binary operation where self is guaranteed to have a
         # _series attribute but other isn't. Example > or +
@@ -117,11 +174,27 @@ def binary_op(name):
         minperiod = max(self._minperiod, getattr(other, '_minperiod', 1))
         minidx = minperiod - 1  # minperiod is 1-based, easier for location
 
+        b = None
+        if npop is not None and not args and not kwargs:
+            b = _np_binop_operand(self, other, npdtype)
+
+        other = getattr(other, '_series', other)  # get real other operand
+        if b is not None:  # run the ufunc straight into the result buffer
+            a = self._values[minidx:]
+            if isinstance(b, np.ndarray):
+                b = b[minidx:]
+
+            result = np.empty(len(self._series), dtype=dtype)
+            result[:minidx] = np.nan  # cast as in the pandas path (bool: True)
+            with np.errstate(all='ignore'):  # pandas delivers inf/nan silently
+                ufunc(*((b, a) if reflected else (a, b)), out=result[minidx:])
+
+            return self._clone(_WRAP(result, self), period=minperiod)
+
         # Prepare a result filled with 'Nan'
         result = pd.Series(np.nan, index=self._series.index)
 
         # Get and prepare the other operand
-        other = getattr(other, '_series', other)  # get real other operand
         other = other[minidx:] if isinstance(other, pd.Series) else other
 
         # Get the operation, exec and store
@@ -131,7 +204,7 @@ def binary_op(name):
 
         return self._clone(result, period=minperiod)  # ret new obj w minperiod
 
-    linesops.install_cls(name=name, attr=real_binary_op)
+    return real_binary_op
 
 
 def standard_op(name, parg=None, sargs=False, skwargs=False):
@@ -159,20 +232,39 @@ def standard_op(name, parg=None, sargs=False, skwargs=False):
 
         return line
 
-    linesops.install_cls(name=name, attr=real_standard_op)
+    return real_standard_op
+
+
+_REDOPS_NP = {
+    # numpy reductions for _REDOPS which deliver what pandas delivers for a
+    # non-empty float64 array when no arguments are given: nan is skipped.
+    # mean is not here: pandas uses bottleneck for it (if installed), which
+    # sums in a different order and may differ in the last digits
+    'max': np.fmax.reduce,
+    'min': np.fmin.reduce,
+    'sum': np.nansum,
+}
 
 
 def reduction_op(name, sargs=False, *args, **kwargs):
+    npop = _REDOPS_NP.get(name)
+
     def real_reduction_op(self, *args, **kwargs):
         if sargs:
             _, minidx, args, _ = self._minperiodize(*args)
         else:
             minidx = self._minperiod - 1
 
+        if npop is not None and not args and not kwargs:
+            if self._series.dtype == np.float64:
+                values = self._values[minidx:]
+                if len(values):
+                    return npop(values)
+
         red_op = getattr(self._series[minidx:], name)
         return red_op(*args, **kwargs)
 
-    linesops.install_cls(name=name, attr=real_reduction_op)
+    return real_reduction_op
 
 
 # Below if _ewm is called
@@ -203,6 +295,39 @@ def reduction_op(name, sargs=False, *args, **kwargs):
 #   - p2 = self._minperiod - 1 + poffset # seed end calc
 #   - p1 = p2 - period  # beginning of seed calculation
 
+# The parameter "_tail" (n) limits the calculation to the last n values, for
+# example to get the latest value after a new bar. Each is calculated with the
+# closed form of the recurrence y[i] = beta * y[i - 1] + alpha * x[i], seeded
+# with y[0] = x[0]: the dot product of the last t + 1 values of x with
+#   - [beta^t, alpha * beta^(t - 1), ..., alpha * beta, alpha]
+#
+# where x[-(t + 1)] plays the role of the seed. t is truncated where beta^t is
+# below the float64 resolution and the older values no longer change the
+# result (nan values are therefore only propagated whilst in the window)
+
+
+def _ewm_tail_len(beta, n):
+    # number of terms (t + 1) needed for the closed form of x[:n]
+    if beta == 0.0:
+        return 0  # no decay, the last value is the result (alpha=1)
+    if abs(beta) >= 1.0:
+        return n - 1  # no decay, the whole array
+
+    t = math.ceil(math.log(np.finfo(np.float64).eps) / math.log(abs(beta)))
+    return min(t, n - 1)
+
+
+@functools.lru_cache(maxsize=64)
+def _ewm_weights(alpha, beta, t):
+    w = beta ** np.arange(t, -1, -1, dtype=np.float64)
+    w[1:] *= alpha
+    w.flags.writeable = False  # shared by all callers via the cache
+    return w
+
+
+def _ewm_closed_form(x, alpha, beta, t):
+    return _ewm_weights(alpha, beta, t) @ x[-(t + 1):]
+
 
 def multifunc_op(name, parg=None, propertize=False):
 
@@ -257,6 +382,7 @@ def multifunc_op(name, parg=None, propertize=False):
 
                 # collect special parameters
                 self._pearly = _pearly = kwargs.pop('_pearly', 0)
+                self._tail = kwargs.pop('_tail', 0)  # only last values
                 self._poffset = kwargs.pop('_poffset', 0)
                 self._seed = _seed = kwargs.pop('_seed', SEED_AVG)
 
@@ -283,36 +409,54 @@ def multifunc_op(name, parg=None, propertize=False):
                 # exponential smoothing calculation
                 self._minidx = pidx = p2 - 1  # beginning of result calculation
 
-                trailprefix = pd.Series(np.nan, index=series.index[pidx:p2])
-                # Determine the actul seed value to use
+                # trailer: seed at pidx + series vals to calc, in 1 buffer
+                values, _ = _AS_F64(series)
+                trailer = np.empty(max(0, len(values) - pidx))
+                trailer[1:] = values[p2:]
+
+                # Determine the actul seed value to use. mean/sum over the
+                # few values of the seed are left to pandas (nan handling and
+                # summation as in the rest of the library)
+                seed = np.nan
                 if _seed == SEED_AVG:
-                    trailprefix[-1] = series[p1:p2].mean()
+                    seed = series[p1:p2].mean()
                 elif _seed == SEED_LAST:
-                    trailprefix[-1] = series[pidx]
+                    seed = values[pidx]
                 elif _seed == SEED_SUM:
-                    trailprefix[-1] = series[p1:p2].sum()
+                    seed = series[p1:p2].sum()
                 elif _seed == SEED_NONE:
                     pass  # no seed wished ... do nothing
-                elif _seed == SEED_ZERO:
-                    trailprefix[-1] = 0.0
-                elif _seed == SEED_ZFILL:
-                    trailprefix[:] = 0.0
+                elif _seed in (SEED_ZERO, SEED_ZFILL):
+                    seed = 0.0
+
+                if len(trailer):
+                    trailer[0] = seed
 
-                # complete trailer: prefix (seed at end) + series vals to calc
-                trailer = trailprefix.append(series[p2:])
+                trailer = pd.Series(trailer, index=series.index[pidx:])
             else:
                 self._pearly = 0  # it will be checked in getattr
+                self._tail = 0
                 self._minidx = self._minperiod - 1
                 trailer = series[self._minidx:]
 
             self._multifunc = getattr(trailer, lsname)(*args, **kwargs)
 
         def _mean_exp(self, alpha, beta=None):  # recurisive definition
+            if self._tail:  # only the last values, see _ewm_closed_form
+                return self._mean_tail(alpha, beta or 1.0 - alpha)
+
+            if signal is not None:  # a single C call over the entire array
+                return self._lfilter(alpha, beta)
+
             # alpha => new data, beta => old data (similar to 1-alpha)
             if not beta:
                 beta = 1.0 - alpha
 
             def _sm_acc(x):
+                if _njit.jitable(self._line):  # same loop in a numba kernel
+                    x = np.asarray(x, dtype=np.float64)
+                    return ewm_recursive(x, alpha, beta)
+
                 prev = x[0]
                 for i in range(1, len(x)):
                     x[i] = prev = beta * prev + alpha * x[i]
@@ -322,9 +466,10 @@ def multifunc_op(name, parg=None, propertize=False):
             return self._apply(_sm_acc)  # trigger __getattr__ for _apply
 
         def _lfilter(self, alpha, beta=None):  # recurisive definition
-            try:
-                import scipy.signal
-            except ImportError:  # if not available use tight loop
+            if self._tail:  # only the last values, see _ewm_closed_form
+                return self._mean_tail(alpha, beta or 1.0 - alpha)
+
+            if signal is None:  # if not available use tight loop (or numba)
                 return self._mean_exp(alpha, beta)
 
             # alpha => new data, beta => old data (similar to 1-alpha)
@@ -338,14 +483,30 @@ def multifunc_op(name, parg=None, propertize=False):
                 # zi = lfiltic([alpha], [1.0, -beta], y=[x[0]])
                 # x[1:], _ = lfilter([alpha], [1.0, -beta], x[1:], zi=zi)
                 x[0] /= alpha  # scale start val, descaled in 1st op by alpha
-                return scipy.signal.lfilter([alpha], [1.0, -beta], x)
+                return signal.lfilter([alpha], [1.0, -beta], x)
 
             return self._apply(_sp_lfilter)  # trigger __getattr__ for _apply
 
+        def _mean_tail(self, alpha, beta):
+            def _closed_form(x):
+                out = np.full(len(x), np.nan)  # nan except for the tail
+                for i in range(max(0, len(x) - self._tail), len(x)):
+                    t = _ewm_tail_len(beta, i + 1)
+                    out[i] = _ewm_closed_form(x[:i + 1], alpha, beta, t)
+
+                return out
+
+            return self._apply(_closed_form)  # trigger __getattr__ for _apply
+
         def _mean(self):  # meant for ewm with dynamic alpha
             def _dynalpha(vals):
                 # reuse vals: not the original series, it's the trailer abvoe
                 alphas = self._alpha_[self._alpha_p - 1:]  # -1: get array idx
+                if _njit.jitable(self._line):  # same loop in a numba kernel
+                    # contiguous float64: a single specialization of kernel
+                    vals = np.ascontiguousarray(vals, dtype=np.float64)
+                    alphas = np.ascontiguousarray(alphas, dtype=np.float64)
+                    return ewm_dynalpha(vals, alphas)
 
                 prev = vals[0]  # seed value, which isn't part of the result
                 vals[0] = np.nan  # made 1 tick longer to carry seed, nan it
@@ -367,17 +528,29 @@ def multifunc_op(name, parg=None, propertize=False):
             op = getattr(self._multifunc, attr)  # get real op/let exp propag
 
             def call_op(*args, **kwargs):  # actual op executor
-                result = pd.Series(np.nan, index=self._series.index)  # prep
-
-                sargs = []  # cov takes an "other" parameter for example
-                for arg in args:
-                    if isinstance(arg, Line):
-                        arg = arg._series[self._minidx:]
-
-                    sargs.append(arg)
+                series, minidx = self._series, self._minidx
+
+                # cov takes an "other" parameter for example. It must be a
+                # series (pandas aligns it), a slice of it is only a view
+                sargs = [arg._series[minidx:] if isinstance(arg, Line) else arg
+                         for arg in args]
+
+                r = op(*sargs, **kwargs)  # run
+
+                # store in a buffer with a nan prefix up to minidx, which is
+                # the only copy made. The old path for whatever doesn't fit
+                values = np.asarray(r)
+                n = len(series)
+                if values.dtype.kind == 'f' and len(values) == n - minidx:
+                    result = np.empty(n, dtype=values.dtype)
+                    result[:minidx] = np.nan
+                    result[minidx:] = values
+                    result = _WRAP(result, series)
+                else:
+                    result = pd.Series(np.nan, index=series.index)
+                    result[minidx:] = r
+                    result = result.astype(r.dtype, copy=False)
 
-                result[self._minidx:] = r = op(*sargs, **kwargs)  # run/store
-                result = result.astype(r.dtype, copy=False)
                 return self._line._clone(result, period=self._minperiod)
 
             return call_op
@@ -393,13 +566,38 @@ def multifunc_op(name, parg=None, propertize=False):
     def real_multifunc_op(self, *args, **kwargs):
         return _MultiFunc_Op(self, *args, **kwargs)
 
-    linesops.install_cls(name=name, attr=real_multifunc_op,
-                         propertize=propertize)
+    return property(real_multifunc_op) if propertize else real_multifunc_op
+
+
+def _proxy_ops():
+    # the proxy operations for Line, to install them in a single update
+    ops = {name: binary_op(name) for name in linesops._BINOPS}
+    for factory, defs in ((reduction_op, linesops._REDOPS),
+                          (standard_op, linesops._STDOPS),
+                          (multifunc_op, linesops._MULTIFUNCOPS)):
+        ops.update((name, factory(name, **opargs))
+                   for name, opargs in defs.items())
+
+    return ops
 
 
 class MetaLine(type):
 
-    def _line_from_dataframe(cls, self, df, colname):
+    def _line_from_holder(cls, self, val, name, index):
+        cls._line_from_line(self, val.outputs[0], name, index)  # 1st line
+
+    def _line_from_lines(cls, self, val, name, index):
+        cls._line_from_line(self, val[0], name, index)  # 1st line
+
+    def _line_from_line(cls, self, val, name, index):
+        self._minperiod = val._minperiod
+        self._series = val._series
+
+    def _line_from_series(cls, self, val, name, index):
+        self._minperiod = 1
+        self._series = val
+
+    def _line_from_dataframe(cls, self, df, colname, index):
         # it must be dataframe(-like) with dimensions
         colnames = [x.lower() for x in df.columns]
         try:
@@ -416,36 +614,44 @@ class MetaLine(type):
         self._minperiod = 1
         self._series = df.iloc[:, idx]
 
+    def _line_from_other(cls, self, val, name, index):
+        # Don't know how to convert, store and pray
+        self._minperiod = 1
+        if index is None:
+            self._series = val  # 1st column
+        else:
+            self._series = pd.Series(val, index=index)
+
+    def _line_from_type(cls, valtype):
+        # finds (and caches) the handler for valtype, checking the supported
+        # types in order of precedence
+        bases = (
+            (linesholder.LinesHolder, MetaLine._line_from_holder),
+            (Lines, MetaLine._line_from_lines),
+            (Line, MetaLine._line_from_line),
+            (pd.Series, MetaLine._line_from_series),
+            (pd.DataFrame, MetaLine._line_from_dataframe),
+        )
+        for base, handler in bases:
+            if issubclass(valtype, base):
+                break
+        else:
+            handler = MetaLine._line_from_other
+
+        _LINE_FROM[valtype] = handler
+        return handler
+
     def __call__(cls, val=None, name='', index=None, *args, **kwargs):
         self = cls.__new__(cls, *args, **kwargs)  # create instance
 
-        # Process input
-        if isinstance(val, linesholder.LinesHolder):
-            val = val.outputs[0]  # get 1st line and process
-            self._minperiod = val._minperiod
-            self._series = val._series
-        elif isinstance(val, Lines):
-            val = val[0]  # get 1st line and process
-            self._minperiod = val._minperiod
-            self._series = val._series
-        elif isinstance(val, Line):
-            self._minperiod = val._minperiod
-            self._series = val._series
-        elif isinstance(val, Line):
-            self._minperiod = val._minperiod
-            self._series = val._series
-        elif isinstance(val, pd.Series):
+        # Process input, with the handler for the type of val
+        if type(val) is pd.Series:  # the most common case, inlined
             self._minperiod = 1
             self._series = val
-        elif isinstance(val, pd.DataFrame):
-            cls._line_from_dataframe(self, val, name)
         else:
-            # Don't know how to convert, store and pray
-            self._minperiod = 1
-            if index is None:
-                self._series = val  # 1st column
-            else:
-                self._series = pd.Series(val, index=index)
+            valtype = type(val)
+            handler = _LINE_FROM.get(valtype) or cls._line_from_type(valtype)
+            handler(cls, self, val, name, index)
 
         self._name = name  # fix the name of the data series
 
@@ -453,26 +659,21 @@ class MetaLine(type):
         return self  # return the instance
 
 
+_LINE_FROM = {}  # type of val => handler in MetaLine.__call__
+
+
 class Line(metaclass=MetaLine):
     _minperiod = 1
     _series = None
     _name = None
+    _vseries = None  # series for which _vcache holds the values
+    _vcache = None
 
     def __hash__(self):
         return super().__hash__()
 
     # Install the different proxy operations
-    for name in linesops._BINOPS:
-        binary_op(name)
-
-    for name, opargs in linesops._REDOPS.items():
-        reduction_op(name, **opargs)
-
-    for name, opargs in linesops._STDOPS.items():
-        standard_op(name, **opargs)
-
-    for name, opargs in linesops._MULTIFUNCOPS.items():
-        multifunc_op(name, **opargs)
+    locals().update(_proxy_ops())
 
     def __call__(self, ago=0, val=np.nan):
         if ago:
@@ -486,9 +687,20 @@ class Line(metaclass=MetaLine):
 
         return self._clone(val, index=self._series.index)
 
+    _ITERCHUNK = 1 << 10  # values converted at once to python floats
+
     def __iter__(self):
+        if self._series.dtype == np.float64:  # python floats, as pandas does
+            return self._iter_chunks(self._values, self._ITERCHUNK)
+
         return iter(self._series)
 
+    @staticmethod
+    def _iter_chunks(values, chunk):
+        # lazy, a consumer stopping early only pays for the chunks it reached
+        for i in range(0, len(values), chunk):
+            yield from values[i:i + chunk].tolist()
+
     def __len__(self):
         return len(self._series)
 
@@ -497,19 +709,57 @@ class Line(metaclass=MetaLine):
 
     def __setitem__(self, item, value):
         self._series[item] = value
+        self._vseries = None  # the dtype (and therefore the array) may change
+
+    @classmethod
+    def _fastclone(cls, series, minperiod):
+        # the line cls(series) would deliver, without the MetaLine dispatch
+        self = cls.__new__(cls)
+        self._minperiod = minperiod
+        self._series = series
+        self._name = ''
+        return self
 
     def _clone(self, series, period=None, index=None):
+        if index is None and isinstance(series, pd.Series):
+            return self._fastclone(series, period or self._minperiod)
+
         line = self.__class__(series, index=index)
         line._minperiod = period or self._minperiod
         return line
 
+    @property
+    def _values(self):
+        # numpy array of the series, fetched once for float64 series. Writing
+        # values to them is done in place and the array stays valid. Other
+        # dtypes may change with the writes and are always fetched
+        series = self._series
+        if series is self._vseries:
+            return self._vcache
+
+        values = series.to_numpy()
+        if values.dtype == np.float64:
+            self._vseries, self._vcache = series, values
+
+        return values
+
+    @property
+    def values(self):
+        return self._values
+
     @property
     def mpseries(self):
         return self._series[self._minperiod - 1:]
 
     @property
     def series(self):
-        return self._series.rename(self._name, inplace=True)
+        # the series named as the line. The series may be shared with other
+        # lines (or be the input of the user): it is not renamed in place
+        series = self._series
+        if series.name == self._name:
+            return series
+
+        return series.rename(self._name, copy=False)
 
     @property
     def index(self):
@@ -527,6 +777,7 @@ class Line(metaclass=MetaLine):
             if idx1 < idx0:  # inc is negative ...
                 idx0, idx1 = idx1, idx0
             self._series[idx0:idx1] = val
+            self._vseries = None  # see __setitem__
 
         self._minperiod += inc
         return self
@@ -541,9 +792,10 @@ class Line(metaclass=MetaLine):
                 i1 = i0 + (i1 or 1)  # i1 rel to i0 or extend i0 by 1 for singl value
             self._series[i0:i1] = val
 
+        self._vseries = None  # see __setitem__
         return self
 
-    def _minperiodize(self, *args, raw=False, **kwargs):
+    def _minperiodize(self, *args, raw=False, dtype=np.float64, **kwargs):
         # apply func, adding args and kwargs
         minpers = [self._minperiod]
         minpers.extend(getattr(x, '_minperiod', 1) for x in args)
@@ -558,7 +810,8 @@ class Line(metaclass=MetaLine):
             if isinstance(x, pd.Series):
                 x = x[minidx:]
                 if raw:
-                    x = x.to_numpy()
+                    x, _ = _AS_F64(x)  # raw => C-contiguous
+                    x = x.astype(dtype, copy=False)  # float32 if configured
 
             nargs.append(x)
 
@@ -568,67 +821,79 @@ class Line(metaclass=MetaLine):
             if isinstance(x, pd.Series):
                 x = x[minidx:]
                 if raw:
-                    x = x.to_numpy()
+                    x, _ = _AS_F64(x)  # raw => C-contiguous
+                    x = x.astype(dtype, copy=False)  # float32 if configured
 
             nkwargs[k] = x
 
         return minperiod, minidx, nargs, nkwargs
 
-    def _apply(self, func, *args, raw=False, **kwargs):
-        minperiod, minidx, a, kw = self._minperiodize(*args, raw=raw, **kwargs)
+    def _apply(self, func, *args, raw=False, dtype=np.float64, **kwargs):
+        minperiod, minidx, a, kw = self._minperiodize(
+            *args, raw=raw, dtype=dtype, **kwargs)
 
         sarray = self._series[minidx:]
-        if raw:
-            sarray = sarray.to_numpy(copy=True)  # let caller modify the buffer
+        if raw:  # let caller modify the buffer, C-contiguous float64/dtype
+            # astype already copies if converting to float32
+            sarray, _ = _AS_F64(sarray, copy=dtype == np.float64)
+            sarray = sarray.astype(dtype, copy=False)
+            result = np.full(len(self._series), np.nan, dtype=dtype)
+            result[minidx:] = func(sarray, *a, **kw)
+            return self._clone(_WRAP(result, self), period=minperiod)
 
         result = pd.Series(np.nan, index=self._series.index)
         result[minidx:] = func(sarray, *a, **kw)
 
         return self._clone(result, period=minperiod)  # create resulting line
 
-    def _applymulti(self, func, *args, raw=False, **kwargs):
-        minperiod, minidx, a, kw = self._minperiodize(*args, raw=raw, **kwargs)
+    def _applymulti(self, func, *args, raw=False, dtype=np.float64, **kwargs):
+        minperiod, minidx, a, kw = self._minperiodize(
+            *args, raw=raw, dtype=dtype, **kwargs)
 
         sarray = self._series[minidx:]
-        if raw:
-            sarray = sarray.to_numpy(copy=True)  # let caller modify the buffer
+        if raw:  # let caller modify the buffer, C-contiguous float64/dtype
+            # astype already copies if converting to float32
+            sarray, _ = _AS_F64(sarray, copy=dtype == np.float64)
+            sarray = sarray.astype(dtype, copy=False)
 
         results = func(sarray, *a, **kw)
         lines = []
         for r in results:
-            result = pd.Series(np.nan, index=self._series.index)
-            result[minidx:] = r
+            if raw:  # compute in numpy, wrap only once
+                result = np.full(len(self._series), np.nan, dtype=dtype)
+                result[minidx:] = r
+                result = _WRAP(result, self)
+            else:
+                result = pd.Series(np.nan, index=self._series.index)
+                result[minidx:] = r
+
             lines.append(self._clone(result, period=minperiod))  # result/store
 
         return lines
 
 
-# These hold the values for the attributes _minperiods/_minperiod for the
-# instances, to avoid having them declared as attributes. Or else __setattr__
-# would set them as Line objects (or logic would be needed in __setattr__ to
-# avoid assigning an object not the real value
-metadata.minperiods = {}
-metadata.minperiod = {}
-
-
 class Lines:
-    __slots__ = []
+    # The values of the attributes _minperiods/_minperiod live in these slots.
+    # They are set with object.__setattr__, because __setattr__ would set them
+    # as Line objects. The generated subclasses define the lines as __slots__
+    __slots__ = ['_minperiods_', '_minperiod_']
 
     @property
     def _minperiods(self):
-        return metadata.minperiods[self]
+        return self._minperiods_
 
     @property
     def _minperiod(self):
-        return metadata.minperiod[self]
+        return self._minperiod_
 
     def _update_minperiod(self):
-        metadata.minperiods[self] = minperiods = [x._minperiod for x in self]
-        metadata.minperiod[self] = max(minperiods)
+        minperiods = [x._minperiod for x in self]
+        object.__setattr__(self, '_minperiods_', minperiods)
+        object.__setattr__(self, '_minperiod_', max(minperiods))
 
     def __init__(self, *args, **kwargs):
-        metadata.minperiods[self] = [1] * len(self)
-        metadata.minperiod[self] = 1
+        object.__setattr__(self, '_minperiods_', [1] * len(self))
+        object.__setattr__(self, '_minperiod_', 1)
 
         for name, value in zip(self.__slots__, args):
             setattr(self, name, value)  # match slots to args
@@ -637,7 +902,14 @@ class Lines:
             setattr(self, name, value)  # try with provided name-value pairs
 
     def __setattr__(self, name, val):
-        super().__setattr__(name, Line(val, name))
+        if isinstance(val, Line):  # skip the dispatch in MetaLine.__call__
+            line = Line.__new__(Line)  # new object, minperiod is not shared
+            line._minperiod, line._series = val._minperiod, val._series
+            line._name = name
+        else:
+            line = Line(val, name)
+
+        super().__setattr__(name, line)
 
     def __contains__(self, item):
         return hasattr(self, item)
@@ -41,7 +41,7 @@ def binary_op(name):
     def real_binary_op(self, other, *args, **kwargs):
         return getattr(self.outputs[0], name)(other, *args, **kwargs)
 
-    linesops.install_cls(name=name, attr=real_binary_op)
+    return real_binary_op
 
 
 class LinesHolder:
@@ -50,8 +50,7 @@ class LinesHolder:
     _sf = None
 
     # Install the different proxy operations
-    for name in linesops._BINOPS:
-        binary_op(name)
+    locals().update((name, binary_op(name)) for name in linesops._BINOPS)
 
     def __call__(self, *args, **kwargs):
         return self.outputs[0](*args, **kwargs)
@@ -4,31 +4,10 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-import sys
-
 
 __all__ = []
 
 
-def install_cls(startlevel=2, name=None, attr=None, propertize=False):
-    # Go up the frames until __module__ is found (present in class declaration)
-    while True:
-        try:
-            frame = sys._getframe(startlevel)
-        except ValueError:
-            return  # went to far up the chain of frames
-
-        if '__module__' in frame.f_locals:  # found class in definition
-            break  # found ... time to
-
-        startlevel += 1  # one up ...
-
-    if propertize:
-        attr = property(attr)
-
-    frame.f_locals[name] = attr  # install in locals => add to class def
-
-
 _BINOPS = (
     # BINary OPerationS: operate on self and other, returning a length-wise
     # equal series with the result of the self-other element-wise operation
@@ -55,6 +34,48 @@ _BINOPS = (
     '__and__', '__or__', '__xor__',
 )
 
+_BINOPS_NP = {
+    # numpy ufuncs for _BINOPS which can operate directly on the float64
+    # arrays of the series, delivering what pandas delivers. floordiv is not
+    # here: pandas post-processes the divisions by zero. pow is not here:
+    # ndarray.__pow__ (used by pandas) has fast paths for some exponents (0.5
+    # => sqrt, 2 => square, -1 => reciprocal) with other roundings than power
+    # name: (ufunc name, reflected => other is the 1st operand)
+
+    # comparison
+    '__eq__': ('equal', False), 'eq': ('equal', False),
+    '__le__': ('less_equal', False), 'le': ('less_equal', False),
+    '__lt__': ('less', False), 'lt': ('less', False),
+    '__ge__': ('greater_equal', False), 'ge': ('greater_equal', False),
+    '__gt__': ('greater', False), 'gt': ('greater', False),
+    '__ne__': ('not_equal', False), 'ne': ('not_equal', False),
+
+    # arithmetic
+    '__add__': ('add', False), 'add': ('add', False),
+    '__radd__': ('add', True), 'radd': ('add', True),
+    '__div__': ('true_divide', False), 'div': ('true_divide', False),
+    'divide': ('true_divide', False),
+    '__rdiv__': ('true_divide', True), 'rdiv': ('true_divide', True),
+    '__mod__': ('remainder', False), 'mod': ('remainder', False),
+    '__rmod__': ('remainder', True), 'rmod': ('remainder', True),
+    '__mul__': ('multiply', False), 'mul': ('multiply', False),
+    'multiply': ('multiply', False),
+    '__rmul__': ('multiply', True), 'rmul': ('multiply', True),
+    '__sub__': ('subtract', False), 'sub': ('subtract', False),
+    'subtract': ('subtract', False),
+    '__rsub__': ('subtract', True), 'rsub': ('subtract', True),
+    '__truediv__': ('true_divide', False), 'truediv': ('true_divide', False),
+    '__rtruediv__': ('true_divide', True), 'rtruediv': ('true_divide', True),
+}
+
+_BINOPS_NP_BOOL = {
+    # as _BINOPS_NP but for the logical operations, which numpy can only take
+    # over from pandas for boolean series (like the results of comparisons)
+    '__and__': ('bitwise_and', False),
+    '__or__': ('bitwise_or', False),
+    '__xor__': ('bitwise_xor', False),
+}
+
 _STDOPS = {
     # STandarD OPerationS: do something with the series
     # the period may be changed and a copy may or ma not be returned
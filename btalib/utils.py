@@ -4,11 +4,19 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
+import numpy as np
+import pandas as pd
+
+try:
+    import numexpr as ne
+except ImportError:  # optional, _FUSED falls back to the line operators
+    ne = None
+
 __all__ = [
     'SEED_AVG', 'SEED_LAST', 'SEED_SUM', 'SEED_NONE', 'SEED_ZERO',
     'SEED_ZFILL',
     '_INCPERIOD', '_DECPERIOD', '_MINIDX',
-    '_SERIES', '_MPSERIES',
+    '_SERIES', '_MPSERIES', '_AS_F64', '_WRAP', '_FUSED',
     '_SETVAL', '_MPSETVAL',
 ]
 
@@ -70,13 +78,75 @@ def _MPSERIES(x):
     return x._series[x._minperiod - 1:]
 
 
+def _AS_F64(x, copy=False):
+    '''Macro like function which delivers the values of the underlying series
+    of `x` (or of `x` if it is already a series) as a C-contiguous float64
+    numpy array, together with the index of the series.
+
+    This is the layout in which raw calculations (like those done with
+    `_apply(..., raw=True)` and the numba kernels) receive the values. Any
+    new raw calculation should take its arrays from here. A copy is only made
+    if the conversion needs it, unless `copy` is `True`
+
+    The kernels supporting float32 (see `config.set_dtype`) get it by
+    converting the result, which `_apply(..., dtype=...)` does
+    '''
+    series = getattr(x, '_series', x)
+    a = series.to_numpy()
+    if copy:
+        a = np.array(a, dtype=np.float64, order='C')
+    else:
+        a = np.ascontiguousarray(a, dtype=np.float64)
+
+    return a, series.index
+
+
+def _WRAP(a, x):
+    '''Macro like function which wraps the numpy array `a`, the result of a
+    raw calculation, in a series with the index of `x` (a line or a series).
+
+    The counterpart of `_AS_F64`: compute in numpy and create the resulting
+    series only once, at the end
+    '''
+    return pd.Series(a, index=getattr(x, '_series', x).index)
+
+
+def _FUSED(expr, **operands):
+    '''Macro like function which evaluates the arithmetic expression `expr`,
+    with the `operands` (lines or scalars) named as the variables, in a single
+    pass with numexpr. Chained line operations would each make a pass over the
+    data and create an intermediate series. The resulting line is like the one
+    the line operations deliver: the minperiod is the largest of the operands
+
+    If numexpr is not available or the operands cannot be combined by
+    position (non-float values or different indices), the expression is
+    evaluated with the line operators, as if it had been directly written
+    '''
+    lines = [x for x in operands.values() if hasattr(x, '_series')]
+    series = [x._series for x in lines]
+    index = series[0].index
+    if ne is None or not all(s.dtype.kind == 'f' and s.index.equals(index)
+                             for s in series):
+        return eval(expr, {'__builtins__': {}}, operands)
+
+    minperiod = max(x._minperiod for x in lines)
+    arrays = {k: _AS_F64(v)[0] if hasattr(v, '_series') else v
+              for k, v in operands.items()}
+
+    result = ne.evaluate(expr, local_dict=arrays)
+    result[:minperiod - 1] = np.nan  # as line operations, nan before minper
+    return lines[0]._clone(_WRAP(result, lines[0]), period=minperiod)
+
+
 def _SETVAL(x, idx, val):
     '''Macro like function which makes clear that one is setting a value in the
     underlying series'''
     x._series[idx] = val
+    x._vseries = None  # the cached values of the line may be stale
 
 
 def _MPSETVAL(x, idx, val):
     '''Macro like function which makes clear that one is setting a value in the
     underlying series'''
     x._series[x._minperiod - 1 + idx] = val
+    x._vseries = None  # see _SETVAL
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import numpy as np
+
+import btalib
+
+
+def run(main=False):
+    close = testcommon.df.close
+    nanclose = close.copy()
+    nanclose.iloc[:5] = np.nan  # leading nan values in the seed window
+
+    LINES = [
+        btalib.sma(close, period=1).sma,  # the plain values
+        btalib.sma(close, period=5).sma,  # leading nan, before the minperiod
+        btalib.sma(nanclose, period=1).sma,
+        btalib.sma(close[:20], period=5).sma,  # shorter than some tails
+    ]
+
+    SMOOTHERS = [
+        ('_mean_exp', dict(alpha=2.0 / 11.0)),
+        ('_lfilter', dict(alpha=1.0, beta=0.9)),
+    ]
+
+    for line in LINES:
+        for seed in (btalib.SEED_AVG, btalib.SEED_LAST):
+            for meth, kwargs in SMOOTHERS:
+                ewm = line._ewm(span=10, _seed=seed)
+                full = getattr(ewm, meth)(**kwargs).series.to_numpy()
+
+                for tail in (1, 10, 50):
+                    ewm = line._ewm(span=10, _seed=seed, _tail=tail)
+                    r = getattr(ewm, meth)(**kwargs).series.to_numpy()
+
+                    # closed form for the tail, nan before it
+                    n = min(tail, len(r))
+                    assert np.allclose(r[-n:], full[-n:], rtol=1e-10,
+                                       equal_nan=True), (meth, seed, tail)
+                    assert np.isnan(r[:-n]).all(), (meth, seed, tail)
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import numpy as np
+
+import btalib
+from btalib import config
+
+
+def run(main=False):
+    df = testcommon.df
+    close, market = df.close, df.open
+
+    TESTS = [
+        (btalib.sum, [close], dict(period=10)),
+        (btalib.max, [close], dict(period=10)),
+        (btalib.min, [close], dict(period=10)),
+        (btalib.ema, [close], dict(period=10)),
+        (btalib.beta, [close, market], dict(period=5)),
+    ]
+
+    # float32 only applies to the numba kernels, else float64 is kept
+    numba = btalib._njit.NUMBA and config.get_use_numba()
+    DTYPE = np.float32 if numba else np.float64
+
+    f64 = [IND(*inputs, **kwargs).df for IND, inputs, kwargs in TESTS]
+    TOL = dict(rtol=1e-4, atol=1e-4, equal_nan=True)  # beta crosses 0
+
+    config.set_dtype(np.float32)
+    try:
+        for (IND, inputs, kwargs), ref in zip(TESTS, f64):
+            outs = IND(*inputs, **kwargs).df
+            assert all(dt == DTYPE for dt in outs.dtypes), IND.__name__
+            outs = outs.to_numpy(np.float64)
+            assert np.allclose(outs, ref.to_numpy(), **TOL), IND.__name__
+
+            # update() also works in float32 mode
+            k = 120
+            indicator = IND(*[x[:k] for x in inputs], **kwargs)
+            pushed = [indicator.update(*[x.iloc[i] for x in inputs])
+                      for i in range(k, len(close))]
+
+            pushed = np.array(pushed, dtype=np.float64)
+            full = ref.iloc[k:, 0].to_numpy()
+            assert np.allclose(pushed, full, **TOL), IND.__name__
+
+        # the raw values at the line boundary are still float64
+        line = btalib.sma(close).sma
+        values, _ = btalib.utils._AS_F64(line)
+        assert values.dtype == np.float64
+        values, _ = btalib.utils._AS_F64(close.astype(np.float32))
+        assert values.dtype == np.float64
+
+    finally:
+        config.set_dtype()  # restore the default
+
+    assert config.get_dtype() == np.float64
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
@@ -6,9 +6,16 @@
 ###############################################################################
 import testcommon
 
+import test_ewmtail
+import test_float32
+import test_linesalias
 import test_linesholder
+import test_linesops
+import test_minmaxindex
 import test_outputs
+import test_streaming
 import test_series_fetcher
+import test_setval
 
 
 def test_run(main=False):
@@ -163,6 +170,13 @@ metatests = dict(
     series_fetcher=test_series_fetcher.run,
     linesholder=test_linesholder.run,
     outputs=test_outputs.run,
+    streaming=test_streaming.run,
+    minmaxindex_nan=test_minmaxindex.run,
+    linesops=test_linesops.run,
+    linesalias=test_linesalias.run,
+    float32=test_float32.run,
+    ewmtail=test_ewmtail.run,
+    setval=test_setval.run,
 )
 
 
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon  # noqa: F401
+
+import numpy as np
+import pandas as pd
+
+import btalib
+
+
+def run(main=False):
+    lines = btalib.meta.lines
+    OUTPUTS = btalib.meta.outputs.Outputs
+
+    # a base definition and a subclass remapping both of its lines
+    class Base:
+        pass
+
+    class Sub(Base):
+        pass
+
+    lines._generate(Base, (), dict(outputs=('x', 'y')), name='outputs',
+                    klass=OUTPUTS)
+
+    dct = dict(outputs=({'a': 'x'}, {'b': 'y'}))
+    CLS = lines._generate(Sub, (Base,), dct, name='outputs', klass=OUTPUTS)
+
+    assert CLS.__name__ == 'OutputsSub'
+    assert Sub.outputs == ('a', 'b')
+    assert list(CLS.__slots__) == ['a', 'b']
+
+    sa, sb = pd.Series(np.arange(5.0)), pd.Series(np.arange(5.0, 10.0))
+    outputs = CLS(sa, sb)
+
+    # each alias reads its own target
+    assert outputs.x is outputs.a
+    assert outputs.y is outputs.b
+    assert outputs.x.series.equals(sa)
+    assert outputs.y.series.equals(sb)
+
+    # and writes to it, leaving the other one untouched
+    sx = pd.Series(np.arange(10.0, 15.0))
+    outputs.x = sx
+    assert outputs.a.series.equals(sx)
+    assert outputs.b.series.equals(sb)
+
+    sy = pd.Series(np.arange(15.0, 20.0))
+    outputs.y = sy
+    assert outputs.b.series.equals(sy)
+    assert outputs.a.series.equals(sx)
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon  # noqa: F401
+
+import operator
+
+import numpy as np
+import pandas as pd
+
+import btalib
+
+
+def run(main=False):
+    s = pd.Series(np.arange(-4.5, 5.5))  # no 0, objects raise dividing by it
+    s[4] = np.nan
+    line = btalib.sma(s, period=1).sma  # line with the values of s
+
+    OPS = [operator.add, operator.sub, operator.mul, operator.truediv,
+           operator.mod, operator.gt, operator.le]
+
+    # int64 limits and beyond: numpy cannot take the latter, pandas can
+    INTS = [3, 2**63 - 1, -2**63, 2**63, 2**70, -2**70]
+
+    for op in OPS:
+        for x in INTS:
+            for a, b, sa, sb in ((line, x, s, x), (x, line, x, s)):
+                with np.errstate(all='ignore'):
+                    result = op(a, b).series
+                    expected = op(sa, sb)
+
+                assert result.dtype == expected.dtype, (op, x)
+                assert result.equals(expected), (op, x)
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
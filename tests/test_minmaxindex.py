@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon  # noqa: F401
+
+import numpy as np
+import pandas as pd
+
+import btalib
+
+
+def run(main=False):
+    # rising values: the max is the last of the window, the min the 1st. The
+    # nan puts nan windows in the middle of the series
+    s = pd.Series(np.arange(20.0))
+    s[5] = np.nan
+    p = 3
+    nan = [5, 6, 7]  # windows containing the nan value
+
+    # ta-lib mode: absolute index over the entire series, 0 when no index
+    # can be calculated (warm-up and nan windows), also after the nan gap
+    maxidx = btalib.maxindex(s, period=p, _talib=True).df.iloc[:, 0]
+    minidx = btalib.minindex(s, period=p, _talib=True).df.iloc[:, 0]
+
+    expmax = np.arange(20.0)
+    expmin = np.arange(20.0) - (p - 1)
+    expmax[:p - 1] = expmin[:p - 1] = 0.0
+    expmax[nan] = expmin[nan] = 0.0
+
+    assert np.array_equal(maxidx.to_numpy(), expmax)
+    assert np.array_equal(minidx.to_numpy(), expmin)
+
+    # regular mode: index relative to the window, nan when not calculable
+    maxidx = btalib.maxindex(s, period=p).df.iloc[:, 0]
+    minidx = btalib.minindex(s, period=p).df.iloc[:, 0]
+
+    expmax = np.full(20, p - 1.0)
+    expmin = np.zeros(20)
+    expmax[:p - 1] = expmin[:p - 1] = np.nan
+    expmax[nan] = expmin[nan] = np.nan
+
+    assert np.array_equal(maxidx.to_numpy(), expmax, equal_nan=True)
+    assert np.array_equal(minidx.to_numpy(), expmin, equal_nan=True)
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
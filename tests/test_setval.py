@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon  # noqa: F401
+
+import numpy as np
+import pandas as pd
+
+import btalib
+from btalib.utils import _MPSETVAL, _SETVAL
+
+
+def run(main=False):
+    def values_line():
+        line = btalib.sma(pd.Series(np.arange(10.0)), period=3).sma
+        line._values  # fill the cache of the numpy values
+        return line
+
+    # writes in place
+    line = values_line()
+    _MPSETVAL(line, 0, 100.0)
+    assert line._values[2] == 100.0
+
+    # writes replacing the array of the series: dtype change, new index
+    line = values_line()
+    _SETVAL(line, 4, 'a')
+    assert line._values.dtype == object and line._values[4] == 'a'
+
+    line = values_line()
+    _SETVAL(line, 10, 7.0)
+    assert len(line._values) == 11 and line._values[10] == 7.0
+
+    line = values_line()
+    _MPSETVAL(line, 8, 9.0)  # minperiod 3 => index 10
+    assert len(line._values) == 11 and line._values[10] == 9.0
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
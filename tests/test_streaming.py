@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import numpy as np
+
+import btalib
+
+
+def run(main=False):
+    df = testcommon.df
+    close, market = df.close.copy(), df.open.copy()
+    close.iloc[[40, 41, 42, 150]] = np.nan  # nan gaps, also whilst priming
+    close.iloc[200] = np.inf
+    market.iloc[[100, 180]] = np.nan
+    crets, mrets = close.pct_change(), market.pct_change()  # for _rets=False
+
+    TESTS = [
+        (btalib.sum, [close], dict(period=10)),
+        (btalib.max, [close], dict(period=10)),
+        (btalib.min, [close], dict(period=10)),
+        (btalib.ema, [close], dict(period=10)),
+        (btalib.ema, [close], dict(period=10, _seed=btalib.SEED_LAST)),
+        (btalib.beta, [close, market], dict(period=5)),
+        (btalib.beta, [crets, mrets], dict(period=5, _rets=False)),
+    ]
+
+    n = len(close)
+    for IND, inputs, kwargs in TESTS:
+        full = IND(*inputs, **kwargs).df.iloc[:, 0].to_numpy()
+
+        for k in (35, 45, 120):  # prime before, in and after the nan gaps
+            indicator = IND(*[x[:k] for x in inputs], **kwargs)
+            pushed = [indicator.update(*[x.iloc[i] for x in inputs])
+                      for i in range(k, n)]
+
+            pushed = np.array(pushed, dtype=np.float64)
+            assert np.allclose(pushed, full[k:], rtol=1e-9, atol=1e-12,
+                               equal_nan=True), (IND.__name__, kwargs, k)
+
+    # without a _stream_state, update is not available
+    class nostream(btalib.StreamingIndicator):
+        inputs = ('close',)
+
+    try:
+        nostream().update(1.0)
+    except btalib.errors.TaPyError:
+        pass
+    else:
+        assert False, 'update without _stream_state'
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)